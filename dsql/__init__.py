@@ -1,2 +1,2 @@
-from querybuilder import buildquery
-from manager import makemanager
+from .querybuilder import buildquery
+from .manager import makemanager
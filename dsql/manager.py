@@ -1,15 +1,28 @@
 from sys import stderr
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
 from functools import partial
+from hashlib import sha1
 from itertools import chain
-from querybuilder import buildquery
+from weakref import WeakKeyDictionary
+from .querybuilder import buildquery
 
 
-def makemanager(conn, dialect='standard'):
+# namedtuple class creation exec()s generated source, which is far too
+# heavy to repeat for every manager; build the class once at import time.
+dbmanager = namedtuple('dbmanager', ('select', 'insert', 'bulk_insert',
+                                     'update', 'delete', 'raw', 'batch',
+                                     'conn'))
+
+dbbatch = namedtuple('dbbatch', ('insert', 'update', 'delete', 'raw'))
+
+
+def makemanager(conn, dialect='standard', prepared=False):
     """
     Create a database manager object with the following API:
 
-    `select`, `insert`, `update`, `delete`, `raw`, `conn`
+    `select`, `insert`, `bulk_insert`, `update`, `delete`, `raw`,
+    `batch`, `conn`
 
     :param conn: object
         A connection object compatible with the Python DB 2.0 API.
@@ -19,27 +32,47 @@ def makemanager(conn, dialect='standard'):
     :param dialect: str
         "standard" | "mysql" | "mssql" | "postgresql"
 
+    :param prepared: bool
+        PostgreSQL only. If True, query shapes seen more than once on
+        this connection are promoted to server-side prepared statements
+        (PREPARE/EXECUTE), skipping the server's parse and plan steps on
+        every repeat. Leave off when connecting through a
+        transaction-pooling proxy, which does not keep session state.
+
     :returns: object
         A object exposing the API mentioned above.
     """
 
-    managerdict = {
-        'select': partial(query, 'select', conn=conn, dialect=dialect),
-        'insert': partial(query, 'insert', conn=conn, dialect=dialect),
-        'update': partial(query, 'update', conn=conn, dialect=dialect),
-        'delete': partial(query, 'delete', conn=conn, dialect=dialect),
-        'raw': partial(query, 'raw', conn=conn, dialect=dialect),
-        'conn': conn,
-    }
-
-    return namedtuple('dbmanager', managerdict.keys())(**managerdict)
-
-
-def query(operation, *args, **kw):
+    # Binding the fixed arguments positionally keeps calls on the cheap
+    # tuple-concatenation path inside partial, instead of merging a
+    # keywords dict on every invocation.
+    return dbmanager(
+        select=partial(query, 'select', conn, dialect, prepared),
+        insert=partial(query, 'insert', conn, dialect, prepared),
+        bulk_insert=partial(bulk_insert, conn, dialect),
+        update=partial(query, 'update', conn, dialect, prepared),
+        delete=partial(query, 'delete', conn, dialect, prepared),
+        raw=partial(query, 'raw', conn, dialect, prepared),
+        batch=partial(batch, conn, dialect),
+        conn=conn,
+    )
+
+
+def query(operation, conn, dialect='standard', prepared=False, *args, **kw):
     """
     :param operation: str
         "select" | "insert" | "update" | "delete" | "raw"
 
+    :param conn: object
+        Connection object.
+
+    :param dialect: str
+        "standard" | "mysql" | "mssql" | "postgresql"
+
+    :param prepared: bool
+        If True (and the dialect is "postgresql"), execute repeated
+        query shapes through server-side prepared statements.
+
     :param *args:
         Additional positional arguments to be relayed to the `querybuilder`
         function. Check out its documentation for more info.
@@ -51,8 +84,6 @@ def query(operation, *args, **kw):
         Except that, the following keys (if exist) will be extracted for use of
         this function, and will not be relayed:
 
-        connection: connection object
-
         commit: bool
             Whether to commit the changes or not.
 
@@ -70,27 +101,133 @@ def query(operation, *args, **kw):
             Optional. A default handler is provided.
     """
 
-    dialect = kw.get('dialect', 'standard')
-
-    conn = kw.pop('conn')
     commit = kw.pop('commit', True)
     dry_run = kw.pop('dry_run', False)
     response_handler = kw.pop('response_handler', handle_response)
 
+    querytpl, queryparams = buildquery(operation, *args, dialect=dialect,
+                                       **kw)
+
+    if dry_run:
+        stderr.write('%s\n%s' % (querytpl, queryparams))
+        return None
+
     cursor = conn.cursor()
 
-    querytpl, queryparams = buildquery(operation, *args, **kw)
+    # buildquery('insert', ..., batch=True) returns a list of per-row
+    # tuples for the driver's batched execution path. Dispatch on the
+    # flag itself (still present in kw, which is only relayed) rather
+    # than sniffing the parameter shape: a plain insert whose first
+    # column value happens to be a tuple, or a raw 'WHERE id IN %s'
+    # query, must stay on cursor.execute.
+    if operation == 'insert' and kw.get('batch'):
+        cursor.executemany(querytpl, queryparams)
+    # Raw statements never go through PREPARE: the server only accepts
+    # SELECT/INSERT/UPDATE/DELETE/VALUES there, and raw text bypasses the
+    # builders, so '%%' literals would corrupt the placeholder rewrite.
+    elif prepared and dialect == 'postgresql' and operation != 'raw':
+        execute_prepared(cursor, conn, querytpl, queryparams)
+    else:
+        cursor.execute(querytpl, queryparams)
+
+    # Selects mutate nothing; committing them anyway would cost a round
+    # trip (and possibly an fsync) per read.
+    if commit and operation != 'select':
+        conn.commit()
+
+    return response_handler(cursor, dialect)
+
+
+def bulk_insert(conn, dialect, tablename, recordlist, chunk_size=500,
+                executemany=False, **kw):
+    """
+    Insert `recordlist` with as few statements as possible.
+
+    Rows are sent in multi-row INSERT statements of at most `chunk_size`
+    rows each, which avoids both per-row round trips and statements that
+    outgrow the server's packet limit on very large batches.
+
+    :param tablename: str
 
+    :param recordlist: list
+        List of record dicts, as accepted by `insert`.
+
+    :param chunk_size: int
+        Maximum number of rows per statement. The default is a
+        conservative fit for stock `max_allowed_packet` style limits.
+
+    :param executemany: bool
+        If True, hand the whole batch to the driver's `executemany` with
+        a single-row template instead of building multi-row statements.
+        Useful for drivers that batch `executemany` themselves; note the
+        DB API ties it to one round trip per row on others. This path
+        does not report per-row ids and returns the number of inserted
+        rows instead.
+
+    :param **kw:
+        Same keyword arguments as the other manager operations
+        (`commit`, `dry_run`, `response_handler`).
+
+    :returns: list | int
+        A list of inserted ids with the default response handler, or a
+        row count with `executemany=True`.
+    """
+
+    if executemany:
+        return executemany_insert(conn, dialect, tablename, recordlist, **kw)
+
+    if len(recordlist) <= chunk_size:
+        return query('insert', conn, dialect, False, tablename, recordlist,
+                     **kw)
+
+    commit = kw.pop('commit', True)
+    dry_run = kw.pop('dry_run', False)
+    results = []
+
+    for start in range(0, len(recordlist), chunk_size):
+        chunk_result = query('insert', conn, dialect, False, tablename,
+                             recordlist[start:start + chunk_size],
+                             commit=False, dry_run=dry_run, **kw)
+
+        if chunk_result:
+            results.extend(chunk_result)
+
+    # A dry run never touches the connection, matching query().
     if dry_run:
-        stderr.write('%s\n%s' % (querytpl, queryparams))
         return None
 
-    cursor.execute(querytpl, queryparams)
+    if commit:
+        conn.commit()
+
+    return results
+
+
+def executemany_insert(conn, dialect, tablename, recordlist,
+                       commit=True, dry_run=False, response_handler=None):
+    """
+    Insert `recordlist` through `cursor.executemany` with a single-row
+    statement template. Used by `bulk_insert` for batches too large to
+    inline into one multi-row statement.
+    """
+
+    querytpl, paramseq = buildquery('insert', tablename, recordlist,
+                                    batch=True, dialect=dialect)
+
+    if dry_run:
+        stderr.write('%s\n<%s rows>' % (querytpl, len(recordlist)))
+        return None
+
+    cursor = conn.cursor()
+
+    cursor.executemany(querytpl, paramseq)
 
     if commit:
         conn.commit()
 
-    return response_handler(cursor, dialect)
+    if response_handler:
+        return response_handler(cursor, dialect)
+
+    return cursor.rowcount
 
 
 def handle_response(cursor, dialect):
@@ -112,7 +249,9 @@ def handle_select_response(cursor, dialect):
     :returns: iterator
     """
 
-    itemiter = iter(cursor)
+    # arraysize defaults to 1 per the DB API, so treat 1000 as the floor;
+    # drivers tuned to a larger batch keep their setting.
+    itemiter = iter_chunked(cursor, max(getattr(cursor, 'arraysize', 1), 1000))
     first_record = next(itemiter, None)
 
     if not first_record:
@@ -121,31 +260,203 @@ def handle_select_response(cursor, dialect):
     itemiter = chain([first_record], itemiter)
 
     # Fix for psycopg2.extras.DictCursor, and the like, which does not
-    # return a dict, but a dict-like object
+    # return a dict, but a dict-like object. dict(item) converts through
+    # the C-level mapping protocol without materializing an items view,
+    # but some row types (e.g. sequence-based ones) do not survive it, so
+    # probe once on the first record and pick the conversion up front.
     if not isinstance(first_record, dict):
-        itemiter = (dict(item.items()) for item in itemiter)
+        try:
+            fast = dict(first_record) == dict(first_record.items())
+        except (TypeError, ValueError):
+            fast = False
+
+        convert = dict if fast else (lambda item: dict(item.items()))
+
+        # map() with a C-level callable iterates without resuming a
+        # Python generator frame per row.
+        itemiter = map(convert, itemiter)
 
     return itemiter
 
 
+@contextmanager
+def batch(conn, dialect='standard'):
+    """
+    Buffer write operations and flush them in a single transaction.
+
+    Yields an object exposing `insert`, `update`, `delete` and `raw`
+    that queue their arguments instead of executing. On a clean exit,
+    adjacent inserts to the same table are merged into one multi-row
+    statement, everything runs on this connection without intermediate
+    commits, and one commit ends the transaction. If the block raises,
+    nothing is executed.
+
+    Buffered operations have no return values; selects are not buffered
+    since their results are needed at the call site. Example:
+
+        with db.batch() as b:
+            b.insert('products', [{'title': 'Pants'}])
+            b.insert('products', [{'title': 'Socks'}])
+            b.delete('products', where=[{'id =': 7}])
+    """
+
+    buffered = []
+
+    def buffer(operation):
+        def op(*args, **kw):
+            buffered.append((operation, args, kw))
+
+        return op
+
+    yield dbbatch(insert=buffer('insert'), update=buffer('update'),
+                  delete=buffer('delete'), raw=buffer('raw'))
+
+    flush_batch(conn, dialect, buffered)
+
+
+def flush_batch(conn, dialect, buffered):
+    """
+    Execute buffered `(operation, args, kw)` triples in order, merging
+    runs of plain inserts to the same table into one statement, then
+    commit once.
+    """
+
+    merged = []
+
+    for operation, args, kw in buffered:
+        previous = merged[-1] if merged else None
+
+        # Only merge inserts that share both the table and the field
+        # tuple; the merged statement binds every row through the first
+        # row's columns.
+        if (operation == 'insert' and not kw
+                and previous
+                and previous[0] == 'insert' and not previous[2]
+                and previous[1][0] == args[0]
+                and tuple(previous[1][1][0]) == tuple(args[1][0])):
+            previous[1][1].extend(args[1])
+            continue
+
+        if operation == 'insert':
+            args = (args[0], list(args[1]))
+
+        merged.append((operation, args, kw))
+
+    for operation, args, kw in merged:
+        query(operation, conn, dialect, False, *args,
+              **dict(kw, commit=False))
+
+    conn.commit()
+
+
+# Per-connection prepared statement state. `_seen_templates` records
+# shapes executed once; a shape is only PREPAREd on its second occurrence
+# so one-off queries never pay the extra round trip. `_prepared_stmts`
+# maps each template to its statement name in LRU order, capped so
+# evicted statements get DEALLOCATEd on the server.
+_PREPARED_STMTS_MAX = 256
+
+_seen_templates = WeakKeyDictionary()
+_prepared_stmts = WeakKeyDictionary()
+
+
+def execute_prepared(cursor, conn, querytpl, queryparams):
+    """
+    Execute `querytpl` through a server-side prepared statement
+    (PostgreSQL). The first occurrence of a template executes directly;
+    the second PREPAREs it, and every one after that is an EXECUTE that
+    skips the server's parse/plan steps.
+    """
+
+    stmts = _prepared_stmts.setdefault(conn, OrderedDict())
+    stmt_name = stmts.get(querytpl)
+
+    if stmt_name is None:
+        seen = _seen_templates.setdefault(conn, set())
+
+        if querytpl not in seen:
+            seen.add(querytpl)
+            return cursor.execute(querytpl, queryparams)
+
+        seen.discard(querytpl)
+
+        stmt_name = 'dsql_' + sha1(querytpl.encode('utf-8')).hexdigest()[:16]
+
+        cursor.execute('PREPARE %s AS %s' % (stmt_name,
+                                             dollar_template(querytpl)))
+        stmts[querytpl] = stmt_name
+
+        if len(stmts) > _PREPARED_STMTS_MAX:
+            _, evicted = stmts.popitem(last=False)
+            cursor.execute('DEALLOCATE %s' % evicted)
+    else:
+        stmts.move_to_end(querytpl)
+
+    if queryparams:
+        cursor.execute('EXECUTE %s (%s)' % (stmt_name,
+                                            ', '.join(['%s'] * len(queryparams))),
+                       queryparams)
+    else:
+        cursor.execute('EXECUTE %s' % stmt_name)
+
+
+def dollar_template(querytpl):
+    """ Rewrite '%s' placeholders as the $1, $2, ... PREPARE expects """
+
+    parts = querytpl.split('%s')
+    stmt = parts[0]
+
+    for position, part in enumerate(parts[1:], 1):
+        stmt += '$%d' % position + part
+
+    return stmt
+
+
+def iter_chunked(cursor, size):
+    """
+    Yield records through `cursor.fetchmany` so the driver can fetch in
+    batches instead of a Python-level call (and, for some drivers, a
+    round trip) per row.
+    """
+
+    while True:
+        batch = cursor.fetchmany(size)
+
+        if not batch:
+            return
+
+        for record in batch:
+            yield record
+
+
 def handle_insert_response(cursor, dialect):
     """
     :param cursor: cursor object
     :returns: list
     """
 
-    if dialect == 'postgresql':
-        # PostgreSQL will return the inserted ids as the result of the
-        # `returning` expression.
-        return [record[0] for record in cursor]
+    return _INSERT_HANDLERS.get(dialect, handle_default_insert)(cursor)
+
+
+def handle_postgresql_insert(cursor):
+    # PostgreSQL will return the inserted ids as the result of the
+    # `returning` expression.
+    return [record[0] for record in cursor]
+
 
-    if dialect == 'mysql':
-        # MySQL returns the first inserted row id when multiple rows are
-        # inserted
-        return range(cursor.lastrowid, cursor.lastrowid + cursor.rowcount)
+def handle_mysql_insert(cursor):
+    # MySQL returns the first inserted row id when multiple rows are
+    # inserted
+    return range(cursor.lastrowid, cursor.lastrowid + cursor.rowcount)
 
+
+def handle_default_insert(cursor):
     return range(cursor.lastrowid - cursor.rowcount, cursor.lastrowid)
 
 
+_INSERT_HANDLERS = {'postgresql': handle_postgresql_insert,
+                    'mysql': handle_mysql_insert}
+
+
 def handle_other_response(cursor, dialect):
     return cursor.rowcount
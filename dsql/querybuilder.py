@@ -1,5 +1,6 @@
-from collections import OrderedDict
+from functools import lru_cache
 from itertools import chain
+from operator import itemgetter
 
 
 def buildquery(operation, *args, **kw):
@@ -12,25 +13,20 @@ def buildquery(operation, *args, **kw):
         )
     """
 
-    builder = {
-        'select': build_select_stmt,
-        'insert': build_insert_stmt,
-        'update': build_update_stmt,
-        'delete': build_delete_stmt,
-        'raw': build_raw_stmt,
-    }[operation]
+    return _BUILDERS[operation](*args, **kw)
 
-    return builder(*args, **kw)
 
-
-def build_select_stmt(tablename, fieldlist=[], where=[], groupby=[], having=[],
-                      orderby=[], limit=0, offset=0, dialect='standard'):
+def build_select_stmt(tablename, fieldlist=(), where=(), groupby=(), having=(),
+                      orderby=(), limit=0, offset=0, dialect='standard'):
     """ """
 
-    where_clause, where_params = build_where_clause(where, dialect=dialect)
-    having_clause, having_params = build_having_clause(having, dialect=dialect)
+    where_clause, where_params = (build_where_clause(where, dialect=dialect)
+                                     if where else _EMPTY_CLAUSE)
+    having_clause, having_params = (build_having_clause(having,
+                                                        dialect=dialect)
+                                       if having else _EMPTY_CLAUSE)
 
-    stmt = ' '.join([
+    stmt = ' '.join(filter(None, [
         build_select_clause(fieldlist, dialect=dialect),
         build_from_clause(tablename, dialect=dialect),
         where_clause,
@@ -38,15 +34,22 @@ def build_select_stmt(tablename, fieldlist=[], where=[], groupby=[], having=[],
         having_clause,
         build_orderby_clause(orderby, dialect=dialect),
         build_limit_clause(limit, offset, dialect=dialect),
-    ])
+    ]))
 
     params = where_params + having_params
 
     return stmt, params
 
 
-def build_insert_stmt(tablename, recordlist, dialect='standard'):
-    """ """
+def build_insert_stmt(tablename, recordlist, batch=False, dialect='standard'):
+    """
+    With `batch=True`, return a single-row statement template and a list
+    of per-row parameter tuples instead, suitable for
+    `cursor.executemany`.
+    """
+
+    if batch:
+        return build_insert_batch(tablename, recordlist, dialect=dialect)
 
     insert_clause, insert_params = build_insert_clause(tablename, recordlist,
                                                        dialect=dialect)
@@ -57,57 +60,101 @@ def build_insert_stmt(tablename, recordlist, dialect='standard'):
     return insert_clause, insert_params
 
 
-def build_update_stmt(tablename, recordpatch, where=[], orderby=[], limit=0,
+def build_update_stmt(tablename, recordpatch, where=(), orderby=(), limit=0,
                       offset=0, dialect='standard'):
     """ """
 
     update_clause, update_params = build_update_clause(tablename, recordpatch,
                                                        dialect=dialect)
-    where_clause, where_params = build_where_clause(where, dialect=dialect)
+    where_clause, where_params = (build_where_clause(where, dialect=dialect)
+                                     if where else _EMPTY_CLAUSE)
 
-    stmt = ' '.join([
+    stmt = ' '.join(filter(None, [
         update_clause,
         where_clause,
         build_orderby_clause(orderby, dialect=dialect),
         build_limit_clause(limit, offset, dialect=dialect),
-    ])
+    ]))
 
     params = update_params + where_params
 
     return stmt, params
 
 
-def build_delete_stmt(tablename, where=[], orderby=[], limit=0,
+def build_delete_stmt(tablename, where=(), orderby=(), limit=0,
                       dialect='standard'):
     """ """
 
-    where_clause, where_params = build_where_clause(where, dialect=dialect)
+    where_clause, where_params = (build_where_clause(where, dialect=dialect)
+                                     if where else _EMPTY_CLAUSE)
 
-    stmt = ' '.join([
+    stmt = ' '.join(filter(None, [
         'DELETE',
         build_from_clause(tablename, dialect=dialect),
         where_clause,
         build_orderby_clause(orderby, dialect=dialect),
         build_limit_clause(limit, dialect=dialect),
-    ])
+    ]))
 
-    params = where_params
+    # Copy so the shared empty-clause list never escapes to callers, who
+    # are free to mutate the params they get back.
+    params = list(where_params)
 
     return stmt, params
 
 
-def build_raw_stmt(stmt, params=[], dialect='standard'):
+def build_raw_stmt(stmt, params=(), dialect='standard'):
     return stmt, params
 
 
-def build_select_clause(fieldlist=[], dialect='standard'):
-    if fieldlist:
-        fieldlist_str = ', '.join(quote_identifier(f, dialect=dialect)
-                                      for f in fieldlist)
-    else:
-        fieldlist_str = '*'
+# Shared result for absent WHERE/HAVING clauses, so the empty case does
+# not allocate a fresh ('', []) pair per call. Treated as read-only.
+_EMPTY_CLAUSE = ('', [])
+
+
+# Parenthesized placeholder groups for the column/IN-list sizes seen in
+# practice, built once at import time; larger sizes fall back to building
+# on the fly.
+_PLACEHOLDER_GROUPS = tuple('(%s)' % ', '.join(['%s'] * count)
+                               for count in range(65))
+
+
+def placeholder_group(count):
+    if count < len(_PLACEHOLDER_GROUPS):
+        return _PLACEHOLDER_GROUPS[count]
+
+    return '(%s)' % ', '.join(['%s'] * count)
 
-    return 'SELECT %s' % fieldlist_str
+
+# Pre-bound str.__mod__ formatters for the common scalar comparisons, so
+# building e.g. '"age" > %s' is a single C-level call on the quoted
+# field; other operators go through the general three-part format.
+_COMPARISON_FMTS = {operator: ('%s ' + operator + ' %%s').__mod__
+                       for operator in ('=', '>', '<', '!=', '<=', '>=')}
+
+
+# Dispatch table built once at import time so `buildquery` does a plain
+# lookup instead of constructing a new dict on every call.
+_BUILDERS = {
+    'select': build_select_stmt,
+    'insert': build_insert_stmt,
+    'update': build_update_stmt,
+    'delete': build_delete_stmt,
+    'raw': build_raw_stmt,
+}
+
+
+def build_select_clause(fieldlist=(), dialect='standard'):
+    if not fieldlist:
+        return 'SELECT *'
+
+    return _select_clause(tuple(fieldlist), dialect)
+
+
+@lru_cache(maxsize=1024)
+def _select_clause(fieldlist, dialect):
+    return 'SELECT %s' % ', '.join(quote_identifier(f, dialect=dialect)
+                                       for f in fieldlist)
 
 
 def build_from_clause(tablename, dialect='standard'):
@@ -115,38 +162,99 @@ def build_from_clause(tablename, dialect='standard'):
 
 
 def build_insert_clause(tablename, recordlist, dialect='standard'):
-    recordlist = [OrderedDict(record) for record in recordlist]
+    # Plain dicts preserve insertion order; only convert records that are
+    # not mappings already (e.g. lists of pairs).
+    recordlist = [record if hasattr(record, 'keys') else dict(record)
+                     for record in recordlist]
+
+    fieldnames = tuple(recordlist[0])
 
-    tpl = 'INSERT INTO %s(%s) VALUES %s' % (
-              quote_identifier(tablename, dialect=dialect),
-              ', '.join(quote_identifier(fieldname, dialect=dialect)
-                           for fieldname in recordlist[0].keys()),
-              ', '.join(['(%s)' % item
-                            for item in ([', '.join(['%s'] * len(recordlist[0].keys()))] * len(recordlist))]),
-          )
+    tpl = _insert_template(tablename, fieldnames, len(recordlist), dialect)
 
-    params = list(chain(*[record.values() for record in recordlist]))
+    getvalues = _record_getter(fieldnames)
+
+    # map + chain.from_iterable stream the per-row value tuples into one
+    # flat list without a Python-level loop frame per row.
+    params = list(chain.from_iterable(map(getvalues, recordlist)))
 
     return tpl, params
 
 
+def build_insert_batch(tablename, recordlist, dialect='standard'):
+    """
+    Return a single-row insert template plus one parameter tuple per
+    record, the shape `cursor.executemany` expects.
+    """
+
+    recordlist = [record if hasattr(record, 'keys') else dict(record)
+                     for record in recordlist]
+
+    fieldnames = tuple(recordlist[0])
+
+    tpl = _insert_template(tablename, fieldnames, 1, dialect)
+
+    getvalues = _record_getter(fieldnames)
+
+    return tpl, [tuple(getvalues(record)) for record in recordlist]
+
+
+def _record_getter(fieldnames):
+    """
+    itemgetter pulls a record's values in field order in a single
+    C-level pass, and also keeps rows whose keys happen to be ordered
+    differently aligned with the column list of the first record.
+    """
+
+    if len(fieldnames) > 1:
+        return itemgetter(*fieldnames)
+
+    return lambda record: (record[fieldnames[0]],)
+
+
+@lru_cache(maxsize=1024)
+def _insert_template(tablename, fieldnames, nrows, dialect):
+    """
+    The SQL text of an insert depends only on its shape (table, field
+    names, row count), not on the values, so it is cached by shape.
+    """
+
+    # One C-level string multiplication instead of materializing a list
+    # of nrows references for a join; matters for large multi-row shapes,
+    # whose templates rarely repeat exactly (nrows is part of the key).
+    placeholder_rows = (placeholder_group(len(fieldnames)) + ', ') * nrows
+
+    return 'INSERT INTO %s(%s) VALUES %s' % (
+               quote_identifier(tablename, dialect=dialect),
+               ', '.join(quote_identifier(fieldname, dialect=dialect)
+                            for fieldname in fieldnames),
+               placeholder_rows[:-2],
+           )
+
+
 def build_update_clause(tablename, recordpatch, dialect='standard'):
-    recordpatch = OrderedDict(recordpatch)
+    if not hasattr(recordpatch, 'keys'):
+        recordpatch = dict(recordpatch)
+
+    tpl = _update_template(tablename, tuple(recordpatch.keys()), dialect)
 
-    tpl = 'UPDATE %s SET %s' % (
-              quote_identifier(tablename, dialect=dialect),
-              ', '.join('%s=%%s' % quote_identifier(fieldname, dialect=dialect)
-                            for fieldname in recordpatch.keys())
-          )
+    return tpl, list(recordpatch.values())
 
-    return tpl, recordpatch.values()
+
+@lru_cache(maxsize=1024)
+def _update_template(tablename, fieldnames, dialect):
+    return 'UPDATE %s SET %s' % (
+               quote_identifier(tablename, dialect=dialect),
+               ', '.join('%s=%%s' % quote_identifier(fieldname,
+                                                     dialect=dialect)
+                             for fieldname in fieldnames)
+           )
 
 
 def build_delete_clause(tablename, dialect='standard'):
     return 'DELETE FROM %s' % quote_identifier(tablename, dialect=dialect)
 
 
-def build_where_clause(conditionlist=[], keyword='WHERE', dialect='standard'):
+def build_where_clause(conditionlist=(), keyword='WHERE', dialect='standard'):
     """
     :param conditionlist: list
 
@@ -168,106 +276,171 @@ def build_where_clause(conditionlist=[], keyword='WHERE', dialect='standard'):
     """
 
     if not conditionlist:
-        return '', []
+        return _EMPTY_CLAUSE
+
+    # Collect the structural signature and the parameter values in the
+    # same pass, so each condition group is traversed exactly once.
+    signature = []
+    values = []
+
+    for condition in conditionlist:
+        group = []
+
+        for predicate, value in condition.items():
+            if isinstance(value, list):
+                group.append((predicate, len(value)))
+                values.extend(value)
+            else:
+                group.append((predicate, None))
+                values.append(value)
 
-    conditionlist = [OrderedDict(condition) for condition in conditionlist]
+        signature.append(tuple(group))
 
-    def build_condition_group(condition):
-        return ' AND '.join(build_condition(predicate, value)
-                                for predicate, value in condition.items())
+    return _where_template(tuple(signature), keyword, dialect), values
 
-    def build_condition(predicate, value):
-        if ' ' not in predicate:
-            raise Exception('The operator is missing in the predicate '
-                            'expression!')
 
-        fieldname, operator = predicate.split(' ', 1)
+@lru_cache(maxsize=1024)
+def _where_template(signature, keyword, dialect):
+    """
+    Build the SQL text of a WHERE/HAVING clause from its structural
+    signature: a tuple of condition groups, each a tuple of (predicate,
+    length-of-list-value-or-None) pairs. The text does not depend on the
+    parameter values, so it is cached by signature.
+    """
+
+    def build_condition_group(group):
+        return ' AND '.join(build_condition(predicate, listlen)
+                                for predicate, listlen in group)
+
+    def build_condition(predicate, listlen):
+        quoted_fieldname, operator = _parse_predicate(predicate, dialect)
+
+        fastfmt = _COMPARISON_FMTS.get(operator)
 
-        if operator in ['in', 'not in'] and isinstance(value, list):
-            placeholders = '(' + ','.join(['%s'] * len(value)) + ')'
+        if fastfmt is not None:
+            return fastfmt(quoted_fieldname)
+
+        if operator in ['in', 'not in'] and listlen is not None:
+            placeholders = placeholder_group(listlen)
         else:
             placeholders = '%s'
 
-        return '%s %s %s' % (quote_identifier(fieldname, dialect=dialect),
-                             validate_operator(operator),
-                             placeholders)
+        return '%s %s %s' % (quoted_fieldname, operator, placeholders)
+
+    tpl = ' OR '.join(['(%s)' % build_condition_group(group)
+                         for group in signature])
+
+    return '%s %s' % (keyword, tpl)
+
 
-    tpl = ' OR '.join(['(%s)' % build_condition_group(condition)
-                         for condition in conditionlist])
+_SUPPORTED_OPERATORS = frozenset((
+    '=', '>', '<', '!=', '<=', '>=', 'in', 'not in', 'like', 'not like'
+))
 
-    values = list(chain(*(flatten(condition.values(), depth=1)
-                           for condition in conditionlist)))
 
-    return '%s %s' % (keyword, tpl), values
+@lru_cache(maxsize=4096)
+def _parse_predicate(predicate, dialect):
+    """
+    Split a predicate like 'age >' into its quoted field name and
+    validated operator. Predicate keys recur across query shapes, so the
+    parse is cached.
+    """
 
+    fieldname, sep, operator = predicate.partition(' ')
 
-def validate_operator(operator):
-    supported_operators = (
-        '=', '>', '<', '!=', '<=', '>=', 'in', 'not in', 'like', 'not like'
-    )
+    if not sep:
+        raise Exception('The operator is missing in the predicate '
+                        'expression!')
 
-    if operator not in supported_operators:
+    if operator not in _SUPPORTED_OPERATORS:
         raise ValueError('Non supported operator!')
 
-    return operator
+    return quote_identifier(fieldname, dialect=dialect), operator
 
 
-def build_having_clause(conditionlist=[], dialect='standard'):
+def build_having_clause(conditionlist=(), dialect='standard'):
     return build_where_clause(conditionlist, keyword='HAVING', dialect=dialect)
 
 
-def build_groupby_clause(grouplist=[], dialect='standard'):
+def build_groupby_clause(grouplist=(), dialect='standard'):
     if not grouplist:
         return ''
 
+    return _groupby_clause(tuple(grouplist), dialect)
+
+
+@lru_cache(maxsize=512)
+def _groupby_clause(grouplist, dialect):
     return 'GROUP BY %s' % ', '.join(quote_identifier(g, dialect=dialect)
                                          for g in grouplist)
 
 
-def build_orderby_clause(orderlist=[], dialect='standard'):
+def build_orderby_clause(orderlist=(), dialect='standard'):
     if not orderlist:
         return ''
 
-    subclauses = ['%s %s' % (quote_identifier(fieldname.lstrip('-'),
-                                              dialect=dialect),
-                             'DESC' if fieldname[0] == '-' else 'ASC')
-                     for fieldname in order]
+    if isinstance(orderlist, str):
+        orderlist = [orderlist]
+
+    return _orderby_clause(tuple(orderlist), dialect)
+
+
+@lru_cache(maxsize=512)
+def _orderby_clause(orderlist, dialect):
+    def subclause(fieldname):
+        desc = fieldname[:1] == '-'
+
+        return '%s %s' % (quote_identifier(fieldname[1:] if desc
+                                              else fieldname,
+                                           dialect=dialect),
+                          'DESC' if desc else 'ASC')
+
+    return 'ORDER BY %s' % ', '.join(subclause(fieldname)
+                                        for fieldname in orderlist)
 
-    return 'ORDER BY %s' % ', '.join(subclauses)
 
+# Dialect-specific limit templates; everything not listed uses the
+# MySQL-style 'LIMIT offset, count' form.
+_LIMIT_TPLS = {'postgresql': 'OFFSET %s LIMIT %s'}
 
+
+@lru_cache(maxsize=512)
 def build_limit_clause(limit=0, offset=0, dialect='standard'):
     if not limit:
         return ''
 
-    if dialect == 'postgresql':
-        clausetpl = 'OFFSET %s LIMIT %s'
-    else:
-        clausetpl = 'LIMIT %s, %s'
+    return _LIMIT_TPLS.get(dialect, 'LIMIT %s, %s') % (offset, limit)
 
-    return clausetpl % (offset, limit)
 
+# Quote templates are resolved once at import time; the identifier cache
+# exploits the bounded vocabulary of table and column names in a schema.
+_QUOTE_TPLS = {'standard': '"%s"',
+               'postgresql': '"%s"',
+               'mysql': '`%s`',
+               'mssql': '[%s]'}
 
-def quote_identifier(identifier, dialect='standard'):
-    templates = {'standard': '"%s"',
-                 'postgresql': '"%s"',
-                 'mysql': '`%s`'}
 
-    return templates[dialect] % identifier
+@lru_cache(maxsize=4096)
+def quote_identifier(identifier, dialect='standard'):
+    return _QUOTE_TPLS[dialect] % identifier
 
 
-def flatten(lst, depth=0, level=0):
+def flatten(lst, depth=0):
     """ Utility to flatten lists with the option to constrain by depth """
 
-    if depth and depth == level:
-        return lst
-
     flatlist = []
+    stack = [(iter(lst), 0)]
+
+    while stack:
+        iterator, level = stack[-1]
+
+        for item in iterator:
+            if isinstance(item, list) and (not depth or level < depth):
+                stack.append((iter(item), level + 1))
+                break
 
-    for item in lst:
-        if isinstance(item, list):
-            flatlist.extend(flatten(item, depth, level + 1))
-        else:
             flatlist.append(item)
+        else:
+            stack.pop()
 
     return flatlist
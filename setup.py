@@ -21,8 +21,10 @@ setup(
         'Intended Audience :: Developers',
         'Topic :: Database',
         'License :: OSI Approved :: MIT License',
-        'Programming Language :: Python :: 2.7',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3.7',
     ],
     keywords='sql db query builder simple',
     packages=find_packages(exclude=['contrib', 'docs', 'tests']),
+    python_requires='>=3.7',
 )